@@ -35,232 +35,555 @@ upper_var    Vector of upper bounds of individual variables (alternatively: uppe
 Additionally, lower_fixed (\tilde{l}) and upper_fixed (\tilde{u}), together lower_var (l_{i,1}) and upper_var (u_{i,n}) should satisfy conditions in the paper.
 For these conditions, see the file ``Overview of requirements on interval lengths.png'' (Table 1 in the paper) in the same directory as this file.
 
+If the instance has no feasible solution, RAP_disjoint raises a ValueError.
+
 '''
 
+import functools
+import hashlib
+import importlib.machinery
+import importlib.util
 import math
-import itertools
-import heapq
-import random
-random.seed(42)
+import os
+import warnings
 
-def RAP_disjoint(R,b,lower_fixed, upper_fixed, lower_var, upper_var):
+import numpy as np
+from numba import njit, prange, get_num_threads
+
+
+#Fast-math flags for the jitted search; 'nnan' and 'ninf' are left out since infinite multipliers are used as sentinels
+_FASTMATH_FLAGS = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+#Number of trunks times number of variables up to which the trunks are searched sequentially (the overhead of the
+#parallel region outweighs the gain below this)
+_SEQUENTIAL_WORK = 1000
+
+
+#Binary min-heap on parallel arrays of keys and entry codes. Code s >= 0 is the lower breakpoint of slot s and
+#code -(s+1) the upper breakpoint of slot s. Slot i < num_var is the original entry of variable i, slot num_var + i
+#the entry that is pushed once variable i has moved to interval m-1. Entries are deleted lazily: slots are marked
+#invalid in a mask and skipped when they reach the top of the heap.
+@njit(cache=True)
+def _heap_sift_down(keys, idx, pos, size):
+    key = keys[pos]
+    code = idx[pos]
+    child = 2*pos + 1
+    while child < size:
+        if child + 1 < size and keys[child + 1] < keys[child]:
+            child += 1
+        if keys[child] < key:
+            keys[pos] = keys[child]
+            idx[pos] = idx[child]
+            pos = child
+            child = 2*pos + 1
+        else:
+            break
+    keys[pos] = key
+    idx[pos] = code
+
+
+@njit(cache=True)
+def _heapify(keys, idx, size):
+    for pos in range(size//2 - 1, -1, -1):
+        _heap_sift_down(keys, idx, pos, size)
+
+
+@njit(cache=True)
+def _heap_push(keys, idx, size, key, code):
+    pos = size
+    while pos > 0:
+        parent = (pos - 1)//2
+        if key < keys[parent]:
+            keys[pos] = keys[parent]
+            idx[pos] = idx[parent]
+            pos = parent
+        else:
+            break
+    keys[pos] = key
+    idx[pos] = code
+    return size + 1
+
+
+@njit(cache=True)
+def _heap_pop_top(keys, idx, size):
+    size -= 1
+    keys[0] = keys[size]
+    idx[0] = idx[size]
+    if size > 0:
+        _heap_sift_down(keys, idx, 0, size)
+    return size
+
+
+@njit(cache=True)
+def _heap_peek(keys, idx, valid_lower, valid_upper, size):
+    #Discard invalid entries on top of the heap; returns the remaining heap size
+    while size > 0:
+        if idx[0] >= 0:
+            if valid_lower[idx[0]]:
+                break
+        elif valid_upper[-idx[0] - 1]:
+            break
+        size = _heap_pop_top(keys, idx, size)
+    return size
+
+
+@njit(cache=True, fastmath=_FASTMATH_FLAGS)
+def _rap_inner(R, b, slot_lower, slot_upper, slot_lower_BPs, slot_upper_BPs, slot_sq_lower, slot_sq_upper, HELP_sum_lower, HELP_sum_upper, HELP_sum_sq_lower, partition_full, heap_keys, heap_idx, valid_lower, valid_upper, mult_start):
+    '''
+    Breakpoint search procedure for a single partition trunk: the last entry of partition_full is increased
+    from partition_full[-2] to num_var - 1. The slot arrays (length 2*num_var) hold the bounds, breakpoints and squared
+    breakpoints of variable i at the start of the trunk (slot i) and in interval m-1 (slot num_var + i); HELP_sum_lower,
+    HELP_sum_upper and HELP_sum_sq_lower are the sums of the lower bounds, upper bounds and squared lower breakpoints at
+    the start of the trunk. The slot arrays are not modified. The heap arrays (length 4*num_var) and validity masks
+    (length 2*num_var) are scratch buffers supplied by the caller, so that they are not reallocated for every trunk.
+    If mult_start is finite, the search is warm-started from it (see below); -math.inf gives a cold start.
+    Returns the best objective value, the corresponding multiplier, the corresponding last entry of
+    partition_full (objective value math.inf if no feasible solution is found) and the multiplier of the
+    first search of the trunk (-math.inf if there is none).
+    '''
     
-    #Dimensions
     num_var = len(b)
-    num_intervals = len(lower_fixed) + 1  
     
-    #Create partition trunks collection
-    list_partitions = list(itertools.combinations_with_replacement(range(-1,num_var), num_intervals - 2))
+    #Warm start: classify the variables at mult_start and put only the breakpoints above it on the heap. If the first
+    #search of the trunk takes place (the trunk start is feasible) and its resource at mult_start is below R, the cold
+    #search would process exactly the breakpoints up to mult_start first, so it continues from the same state
+    FLAG_warm = 0
+    if -math.inf < mult_start < math.inf and HELP_sum_lower <= R and HELP_sum_upper >= R:
+        HELP_var_Bounded = 0.0
+        HELP_var_Free = 0.0
+        HELP_var_num_free = 0
+        HELP_var_value_Bound = 0.0
+        HELP_num_heap = 0
+        for i in range(0,num_var):
+            if mult_start < slot_lower_BPs[i]:
+                HELP_var_Bounded += slot_lower[i]
+                HELP_var_value_Bound += slot_sq_lower[i]
+                heap_keys[HELP_num_heap] = slot_lower_BPs[i]
+                heap_idx[HELP_num_heap] = i
+                heap_keys[HELP_num_heap + 1] = slot_upper_BPs[i]
+                heap_idx[HELP_num_heap + 1] = -(i + 1)
+                HELP_num_heap += 2
+            elif mult_start < slot_upper_BPs[i]:
+                HELP_var_Free += b[i]
+                HELP_var_num_free += 1
+                heap_keys[HELP_num_heap] = slot_upper_BPs[i]
+                heap_idx[HELP_num_heap] = -(i + 1)
+                HELP_num_heap += 1
+            else:
+                HELP_var_Bounded += slot_upper[i]
+                HELP_var_value_Bound += slot_sq_upper[i]
+        if HELP_var_Bounded + HELP_var_num_free * mult_start - HELP_var_Free < R:
+            FLAG_warm = 1
     
-    #Initialize bookkeeping for best solution and partition
-    current_best_obj = math.inf
-    current_best_partition = None
-    current_best_mult = None
-    
-    #Start iterating over trunks of partitions
-    for partition in list_partitions:
-        partition_full = list(partition)
-        if len(partition_full) == 0:
-            partition_full.append(-1)
-        else:
-            partition_full.append(partition[-1])
+    if FLAG_warm == 0:
+        #Initialize bookkeeping parameters
+        HELP_var_Bounded = HELP_sum_lower
+        HELP_var_Free = 0.0
+        HELP_var_num_free = 0
+        HELP_var_value_Bound = HELP_sum_sq_lower
         
-        #Set lower and upper bounds of variables, given the current partition
-        lower_bounds = [0]*num_var
-        for i in range(0,partition_full[0] + 1):
-            lower_bounds[i] = lower_var[i]
-        for j in range(1,num_intervals - 2):
-            for i in range(partition_full[j-1] + 1 , partition_full[j] + 1):
-                lower_bounds[i] = lower_fixed[j-1]
-        for i in range(partition_full[num_intervals - 2] + 1 , num_var):
-            lower_bounds[i] = lower_fixed[num_intervals - 2]
+        #Initialize breakpoint heap with both the lower and upper breakpoints (each variable is pushed at most twice more)
+        for i in range(0,num_var):
+            heap_keys[i] = slot_lower_BPs[i]
+            heap_idx[i] = i
+            heap_keys[num_var + i] = slot_upper_BPs[i]
+            heap_idx[num_var + i] = -(i + 1)
+        HELP_num_heap = 2*num_var
+    _heapify(heap_keys, heap_idx, HELP_num_heap)
+    valid_lower[:] = True
+    valid_upper[:] = True
+    
+    HELP_feasible_check_lower = HELP_sum_lower
+    HELP_feasible_check_upper = HELP_sum_upper
+    
+    HELP_part_end = partition_full[-1]
+    
+    #Initialize bookkeeping for best solution of this trunk
+    best_obj = math.inf
+    best_mult = -math.inf
+    best_end = HELP_part_end
+    Opt_mult = -math.inf
+    Obj_value = math.inf
+    first_mult = -math.inf
+    
+    #Start breakpoint search procedure
+    while HELP_part_end < num_var:
+        if HELP_feasible_check_lower > R:
+            Opt_mult = -math.inf
+        elif HELP_feasible_check_upper < R:
+            break
+        else:
+            FLAG_found = 0
+            while FLAG_found == 0:
+                HELP_num_heap = _heap_peek(heap_keys, heap_idx, valid_lower, valid_upper, HELP_num_heap)
                 
-        upper_bounds = [0]*num_var
-        for i in range(0,partition_full[0] + 1):
-            upper_bounds[i] = upper_fixed[0]
-        for j in range(1,num_intervals - 2):
-            for i in range(partition_full[j-1] + 1, partition_full[j] + 1):
-                upper_bounds[i] = upper_fixed[j]
-        for i in range(partition_full[num_intervals - 2] + 1, num_var):
-            upper_bounds[i] = upper_var[i]
+                #Final selection candidate breakpoint
+                if HELP_num_heap > 0:
+                    Candidate_BP = heap_keys[0]
+                elif HELP_var_num_free == 0:
+                    #All breakpoints processed and all variables at their upper bound, yet the resource is below R
+                    #(only through rounding, since the sum of the upper bounds is at least R): no solution at this end
+                    Opt_mult = math.inf
+                    Obj_value = math.inf
+                    break
+                else:
+                    Candidate_BP = math.inf
+                HELP_resource = HELP_var_Bounded + HELP_var_num_free * Candidate_BP - HELP_var_Free
                 
-        #Calculate breakpoints
-        lower_breakpoints = [lower_bounds[i] + b[i] for i in range(0,num_var)]
-        upper_breakpoints = [upper_bounds[i] + b[i] for i in range(0,num_var)]
-        
-        #Initialize bookkeeping parameters
-        HELP_var_Bounded = sum(lower_bounds)
-        HELP_var_Free = 0
-        HELP_var_num_free = 0
-        HELP_var_value_Bound = sum([math.pow(lower_breakpoints[i],2) for i in range(0,num_var)])
+                if HELP_resource == R:
+                    Opt_mult = Candidate_BP
+                    Obj_value = HELP_var_value_Bound + HELP_var_num_free * Opt_mult*Opt_mult
+                    FLAG_found = 1
+                elif HELP_resource > R:
+                    Opt_mult = (R - HELP_var_Bounded + HELP_var_Free) / HELP_var_num_free
+                    Obj_value = HELP_var_value_Bound + HELP_var_num_free * Opt_mult*Opt_mult
+                    FLAG_found = 1
+                else:
+                    #Branchless update: HELP_sign is +1 for a lower breakpoint (code s) and -1 for an upper breakpoint (code -(s+1))
+                    HELP_code = heap_idx[0]
+                    HELP_sign = 1 | (HELP_code >> 31)
+                    HELP_slot = HELP_code ^ (HELP_code >> 31)
+                    HELP_index = HELP_slot % num_var
+                    HELP_var_Bounded -= HELP_sign * (slot_upper[HELP_slot] if HELP_code < 0 else slot_lower[HELP_slot])
+                    HELP_var_Free += HELP_sign * b[HELP_index]
+                    HELP_var_num_free += HELP_sign
+                    HELP_var_value_Bound -= HELP_sign * (slot_sq_upper[HELP_slot] if HELP_code < 0 else slot_sq_lower[HELP_slot])
+                    HELP_num_heap = _heap_pop_top(heap_keys, heap_idx, HELP_num_heap)
+            
+            if first_mult == -math.inf:
+                first_mult = Opt_mult
+            
+            #Compare to currently best obj_value
+            if Obj_value < best_obj:
+                best_obj = Obj_value
+                best_mult = Opt_mult
+                best_end = HELP_part_end
         
-        #Initialize breakpoint heaps
-        heap_lower_BPs = [[lower_breakpoints[i],i,0] for i in range(0,num_var)]
-        heap_upper_BPs = [[upper_breakpoints[i],i,0] for i in range(0,num_var)]
-        heapq.heapify(heap_lower_BPs)
-        heapq.heapify(heap_upper_BPs)
-        HELP_num_lower_heap = num_var
-        HELP_num_upper_heap = num_var
+        #Update partition
+        HELP_part_end += 1
+        HELP_index = HELP_part_end
+        HELP_slot = num_var + HELP_index
         
-        HELP_feasible_check_lower = sum(lower_bounds)
-        HELP_feasible_check_upper = sum(upper_bounds)
-       
-        #Start breakpoint search procedure
-        while partition_full[-1] < num_var:
-            if HELP_feasible_check_lower > R:
-                Opt_mult = -math.inf
-            elif HELP_feasible_check_upper < R:
-                break
+        if HELP_part_end >= num_var:
+            break
+        else:
+            #First update round (the variable leaves interval m)
+            if Opt_mult <= slot_lower_BPs[HELP_index]:
+                HELP_var_Bounded -= slot_lower[HELP_index]
+                HELP_var_value_Bound -= slot_sq_lower[HELP_index]
+            elif Opt_mult <= slot_upper_BPs[HELP_index]:
+                HELP_var_Free -= b[HELP_index]
+                HELP_var_num_free -= 1
             else:
-                FLAG_found = 0
-                while FLAG_found == 0:
-                    FLAG_found_lower = 0
-                    while FLAG_found_lower == 0:
-                        if HELP_num_lower_heap > 0:
-                            Candidate_BP_lower = heap_lower_BPs[0][0]                            
-                            if len(partition_full) == 1:
-                                HELP_part_bound = -1
-                            else:
-                                HELP_part_bound = partition_full[-2]                           
-                            if HELP_part_bound < heap_lower_BPs[0][1] and heap_lower_BPs[0][1] < partition_full[-1] and heap_lower_BPs[0][2] == 0:
-                                heapq.heappop(heap_lower_BPs)
-                                HELP_num_lower_heap -= 1
-                            else:
-                                FLAG_found_lower = 1
-                        else:
-                            Candidate_BP_lower = math.inf
-                            FLAG_found_lower = 1                            
-                    FLAG_found_upper = 0       
-                    while FLAG_found_upper == 0:
-                        if HELP_num_upper_heap > 0:
-                            Candidate_BP_upper = heap_upper_BPs[0][0]                            
-                            if len(partition_full) == 1:
-                                HELP_part_bound = -1
-                            else:
-                                HELP_part_bound = partition_full[-2]                           
-                            if HELP_part_bound < heap_upper_BPs[0][1] and heap_upper_BPs[0][1] <= partition_full[-1] and heap_upper_BPs[0][2] == 0:
-                                heapq.heappop(heap_upper_BPs)
-                                HELP_num_upper_heap -= 1
-                            else:
-                                FLAG_found_upper = 1
-                        else:
-                            Candidate_BP_upper = math.inf
-                            FLAG_found_upper = 1        
-                    
-                    #Final selection candidate breakpoint
-                    Candidate_BP = min(Candidate_BP_lower, Candidate_BP_upper)
-                    HELP_resource = HELP_var_Bounded + HELP_var_num_free * Candidate_BP - HELP_var_Free
-                    
-                    if HELP_resource == R:
-                        Opt_mult = Candidate_BP
-                        Obj_value = HELP_var_value_Bound + HELP_var_num_free * math.pow(Opt_mult,2)
-                        FLAG_found = 1
-                    elif HELP_resource > R:
-                       Opt_mult = (R - HELP_var_Bounded + HELP_var_Free) / HELP_var_num_free
-                       Obj_value = HELP_var_value_Bound + HELP_var_num_free * math.pow(Opt_mult,2)                   
-                       FLAG_found = 1
-                    else:
-                        if Candidate_BP_lower < Candidate_BP_upper:
-                            HELP_index = heap_lower_BPs[0][1]
-                            HELP_var_Bounded -= lower_bounds[HELP_index]
-                            HELP_var_Free += b[HELP_index]
-                            HELP_var_num_free += 1
-                            HELP_var_value_Bound -= math.pow(lower_bounds[HELP_index] + b[HELP_index],2)
-                            heapq.heappop(heap_lower_BPs)
-                            HELP_num_lower_heap -= 1
-                        else:
-                            HELP_index = heap_upper_BPs[0][1]
-                            HELP_var_Bounded += upper_bounds[HELP_index]
-                            HELP_var_Free -= b[HELP_index]
-                            HELP_var_num_free -= 1
-                            HELP_var_value_Bound += math.pow(upper_bounds[HELP_index] + b[HELP_index],2)
-                            heapq.heappop(heap_upper_BPs)
-                            HELP_num_upper_heap -= 1
-    
-                #Compare to currently best obj_value
-                if Obj_value < current_best_obj:
-                    current_best_obj = Obj_value
-                    current_best_partition = partition_full
-                    current_best_mult = Opt_mult                
+                HELP_var_Bounded -= slot_upper[HELP_index]
+                HELP_var_value_Bound -= slot_sq_upper[HELP_index]
             
-            #Update partition
-            partition_full[-1] += 1
-            HELP_index = partition_full[-1]
+            HELP_feasible_check_lower -= slot_lower[HELP_index]
+            HELP_feasible_check_upper -= slot_upper[HELP_index]
             
-            if partition_full[-1] >= num_var:
-                break
+            #The original breakpoints of the variable become stale
+            valid_lower[HELP_index] = False
+            valid_upper[HELP_index] = False
+            
+            HELP_feasible_check_lower += slot_lower[HELP_slot]
+            HELP_feasible_check_upper += slot_upper[HELP_slot]
+            
+            #Second update round (the variable enters interval m-1)
+            if Opt_mult <= slot_lower_BPs[HELP_slot]:
+                HELP_var_Bounded += slot_lower[HELP_slot]
+                HELP_var_value_Bound += slot_sq_lower[HELP_slot]
+                HELP_num_heap = _heap_push(heap_keys, heap_idx, HELP_num_heap, slot_lower_BPs[HELP_slot], HELP_slot)
+                HELP_num_heap = _heap_push(heap_keys, heap_idx, HELP_num_heap, slot_upper_BPs[HELP_slot], -(HELP_slot + 1))
+            elif Opt_mult <= slot_upper_BPs[HELP_slot]:
+                HELP_var_Free += b[HELP_index]
+                HELP_var_num_free += 1
+                HELP_num_heap = _heap_push(heap_keys, heap_idx, HELP_num_heap, slot_upper_BPs[HELP_slot], -(HELP_slot + 1))
             else:
-                #First update round (no removal of breakpoints due to labeling structure)
-                if Opt_mult < lower_breakpoints[HELP_index]:
-                    HELP_var_Bounded -= lower_bounds[HELP_index]
-                    HELP_var_value_Bound -= math.pow(lower_bounds[HELP_index] + b[HELP_index],2)
-                elif lower_breakpoints[HELP_index] < Opt_mult and Opt_mult < upper_breakpoints[HELP_index]:
-                    HELP_var_Free -= b[HELP_index]
-                    HELP_var_num_free -= 1
-                else:
-                    HELP_var_Bounded -= upper_bounds[HELP_index]
-                    HELP_var_value_Bound -= math.pow(upper_bounds[HELP_index] + b[HELP_index],2)
-                    
-                    
-                HELP_feasible_check_lower -= lower_bounds[HELP_index]
-                HELP_feasible_check_upper -= upper_bounds[HELP_index]
-                
-                #Compute new BPs...
-                if len(lower_fixed) == 1:
-                    lower_breakpoints[HELP_index] = lower_var[HELP_index] + b[HELP_index]
-                else:
-                    lower_breakpoints[HELP_index] = lower_fixed[-2] + b[HELP_index]
-                upper_breakpoints[HELP_index] = upper_fixed[-1] + b[HELP_index]
+                HELP_var_Bounded += slot_upper[HELP_slot]
+                HELP_var_value_Bound += slot_sq_upper[HELP_slot]
     
-                if len(lower_fixed) == 1:
-                    lower_bounds[HELP_index] = lower_var[HELP_index]
-                else:
-                    lower_bounds[HELP_index] = lower_fixed[-2]
-                upper_bounds[HELP_index] = upper_fixed[-1]            
-                
-                HELP_feasible_check_lower += lower_bounds[HELP_index]
-                HELP_feasible_check_upper += upper_bounds[HELP_index]
-                
-                #Second update round
-                if Opt_mult < lower_breakpoints[HELP_index]:
-                    HELP_var_Bounded += lower_bounds[HELP_index]
-                    HELP_var_value_Bound += math.pow(lower_bounds[HELP_index] + b[HELP_index],2)
-                    heapq.heappush(heap_lower_BPs, [lower_breakpoints[HELP_index],HELP_index,1])
-                    HELP_num_lower_heap += 1
-                    heapq.heappush(heap_upper_BPs, [upper_breakpoints[HELP_index],HELP_index,1])
-                    HELP_num_upper_heap += 1
-                elif lower_breakpoints[HELP_index] < Opt_mult and Opt_mult < upper_breakpoints[HELP_index]:
-                    HELP_var_Free += b[HELP_index]
-                    HELP_var_num_free += 1
-                    heapq.heappush(heap_upper_BPs, [upper_breakpoints[HELP_index],HELP_index,1])
-                    HELP_num_upper_heap += 1
-                else:
-                    HELP_var_Bounded += upper_bounds[HELP_index]
-                    HELP_var_value_Bound += math.pow(upper_bounds[HELP_index] + b[HELP_index],2)             
+    return best_obj, best_mult, best_end, first_mult
+
 
+@njit(cache=True)
+def _update_bounds(partition_full, start, stop, b, lower_fixed, upper_fixed, lower_var, upper_var, lower_bounds, upper_bounds, lower_breakpoints, upper_breakpoints, sq_lower_BPs, sq_upper_BPs):
+    '''
+    Set the bounds, breakpoints and squared breakpoints of the variables start, ..., stop - 1 according to the segments of partition_full.
+    Returns the resulting changes in the sums of the lower bounds, the upper bounds and the squared lower breakpoints.
+    '''
+    
+    num_intervals = len(lower_fixed) + 1
     
-    #Calculate final answer using optimal multiplier and partition
-    lower_bounds = [0]*num_var
-    for i in range(0,current_best_partition[0] ):
-        lower_bounds[i] = lower_var[i]
-    for j in range(1,num_intervals - 2):
-        for i in range(current_best_partition[j-1]  , current_best_partition[j] ):
+    HELP_delta_lower = 0.0
+    HELP_delta_upper = 0.0
+    HELP_delta_sq_lower = 0.0
+    j = 0
+    for i in range(start,stop):
+        #Variable i lies in interval j+1
+        while j < num_intervals - 1 and partition_full[j] < i:
+            j += 1
+        HELP_delta_lower -= lower_bounds[i]
+        HELP_delta_upper -= upper_bounds[i]
+        HELP_delta_sq_lower -= sq_lower_BPs[i]
+        if j == 0:
+            lower_bounds[i] = lower_var[i]
+        else:
             lower_bounds[i] = lower_fixed[j-1]
-    for i in range(current_best_partition[num_intervals - 2]  , num_var):
-        lower_bounds[i] = lower_fixed[num_intervals - 2]
-
-    upper_bounds = [0]*num_var
-    for i in range(0,current_best_partition[0] ):
-        upper_bounds[i] = upper_fixed[0]
-    for j in range(1,num_intervals - 2):
-        for i in range(current_best_partition[j-1] , current_best_partition[j] ):
+        if j == num_intervals - 1:
+            upper_bounds[i] = upper_var[i]
+        else:
             upper_bounds[i] = upper_fixed[j]
-    for i in range(current_best_partition[num_intervals - 2] , num_var):
-        upper_bounds[i] = upper_var[i]
+        lower_breakpoints[i] = lower_bounds[i] + b[i]
+        upper_breakpoints[i] = upper_bounds[i] + b[i]
+        sq_lower_BPs[i] = lower_breakpoints[i]*lower_breakpoints[i]
+        sq_upper_BPs[i] = upper_breakpoints[i]*upper_breakpoints[i]
+        HELP_delta_lower += lower_bounds[i]
+        HELP_delta_upper += upper_bounds[i]
+        HELP_delta_sq_lower += sq_lower_BPs[i]
+    
+    return HELP_delta_lower, HELP_delta_upper, HELP_delta_sq_lower
+
+
+#Enumeration of partition trunks in the lexicographic order of itertools.combinations_with_replacement(range(-1,num_var), m-2),
+#without materializing them; partition_full holds the trunk followed by a copy of its last entry (-1 if m = 2)
+@njit(cache=True)
+def _num_partitions(num_values, size):
+    #Number of nondecreasing sequences of the given size with entries from num_values values
+    HELP_count = 1
+    for i in range(1,size + 1):
+        HELP_count = HELP_count * (num_values - 1 + i) // i
+    return HELP_count
+
+
+@njit(cache=True)
+def _unrank_partition(k, num_var, partition_full):
+    #Set partition_full to the k-th trunk (counting from 0)
+    size = len(partition_full) - 1
+    if size == 1:
+        #Trunks of a single index (m = 3): the k-th trunk is k - 1
+        partition_full[0] = k - 1
+        partition_full[1] = k - 1
+        return
+    HELP_value = -1
+    for t in range(0,size):
+        while k >= _num_partitions(num_var - HELP_value, size - t - 1):
+            k -= _num_partitions(num_var - HELP_value, size - t - 1)
+            HELP_value += 1
+        partition_full[t] = HELP_value
+    if size > 0:
+        partition_full[size] = partition_full[size - 1]
+    else:
+        partition_full[size] = -1
+
+
+@njit(cache=True)
+def _next_partition(partition_full, num_var):
+    #Advance partition_full to the next trunk (which must exist)
+    size = len(partition_full) - 1
+    t = size - 1
+    while partition_full[t] == num_var - 1:
+        t -= 1
+    partition_full[t] += 1
+    for u in range(t + 1,size + 1):
+        partition_full[u] = partition_full[t]
+
+
+@njit(cache=True)
+def _rap_chunk(R, b, first, last, lower_fixed, upper_fixed, lower_var, upper_var):
+    '''
+    Breakpoint search procedure over the partition trunks first, ..., last - 1 (in lexicographic order). The first
+    trunk is computed from its index, after which the trunk advances in place and the bounds and their sums are
+    updated incrementally. Returns the best objective value, the corresponding multiplier and the corresponding partition.
+    '''
+    
+    #Dimensions
+    num_var = len(b)
+    num_intervals = len(lower_fixed) + 1
+    
+    #Bookkeeping for best solution
+    current_best_obj = math.inf
+    current_best_mult = -math.inf
+    current_best_partition = np.full(num_intervals - 1, -1, dtype=np.int64)
+    
+    #Bounds, breakpoints and squared breakpoints per heap slot: slot i holds the values of variable i at the start of
+    #a trunk (maintained incrementally over consecutive trunks, as are their sums), slot num_var + i the values of
+    #variable i in interval m-1
+    slot_lower = np.zeros(2*num_var)
+    slot_upper = np.zeros(2*num_var)
+    slot_lower_BPs = np.zeros(2*num_var)
+    slot_upper_BPs = np.zeros(2*num_var)
+    slot_sq_lower = np.zeros(2*num_var)
+    slot_sq_upper = np.zeros(2*num_var)
+    #Bounds of interval m-1 that are fixed (the lower bound is variable if m = 2)
+    HELP_lower_last = lower_fixed[-2] if num_intervals > 2 else 0.0
+    HELP_upper_last = upper_fixed[-1]
+    for i in range(0,num_var):
+        if num_intervals == 2:
+            slot_lower[num_var + i] = lower_var[i]
+        else:
+            slot_lower[num_var + i] = HELP_lower_last
+        slot_upper[num_var + i] = HELP_upper_last
+        slot_lower_BPs[num_var + i] = slot_lower[num_var + i] + b[i]
+        slot_upper_BPs[num_var + i] = slot_upper[num_var + i] + b[i]
+        slot_sq_lower[num_var + i] = slot_lower_BPs[num_var + i]*slot_lower_BPs[num_var + i]
+        slot_sq_upper[num_var + i] = slot_upper_BPs[num_var + i]*slot_upper_BPs[num_var + i]
+    HELP_sum_lower = 0.0
+    HELP_sum_upper = 0.0
+    HELP_sum_sq_lower = 0.0
+    partition_full = np.full(num_intervals - 1, -1, dtype=np.int64)
+    partition_prev = np.full(num_intervals - 1, -1, dtype=np.int64)
+    
+    #Scratch buffers of the breakpoint search, reused by all trunks (heap entries packed as a float64 key and an int32 code)
+    heap_keys = np.empty(4*num_var)
+    heap_idx = np.empty(4*num_var, dtype=np.int32)
+    valid_lower = np.empty(2*num_var, dtype=np.bool_)
+    valid_upper = np.empty(2*num_var, dtype=np.bool_)
+    
+    HELP_warm_mult = -math.inf
+    for k in range(first,last):
+        if k == first:
+            _unrank_partition(k, num_var, partition_full)
+        else:
+            _next_partition(partition_full, num_var)
+        
+        #Update bounds of the variables whose segment differs from the previous trunk (lexicographic order: typically one variable)
+        if k == first:
+            HELP_start = 0
+            HELP_stop = num_var
+        else:
+            HELP_start = num_var
+            HELP_stop = 0
+            for j in range(0,num_intervals - 1):
+                if partition_full[j] != partition_prev[j]:
+                    HELP_start = min(HELP_start, min(partition_full[j], partition_prev[j]) + 1)
+                    HELP_stop = max(HELP_stop, max(partition_full[j], partition_prev[j]) + 1)
+        HELP_delta_lower, HELP_delta_upper, HELP_delta_sq_lower = _update_bounds(partition_full, HELP_start, HELP_stop, b, lower_fixed, upper_fixed, lower_var, upper_var, slot_lower, slot_upper, slot_lower_BPs, slot_upper_BPs, slot_sq_lower, slot_sq_upper)
+        HELP_sum_lower += HELP_delta_lower
+        HELP_sum_upper += HELP_delta_upper
+        HELP_sum_sq_lower += HELP_delta_sq_lower
+        partition_prev[:] = partition_full
+        
+        #Consecutive trunks differ in few variables, so the search is warm-started from the first multiplier of the previous trunk
+        Obj_value, Opt_mult, Opt_end, HELP_warm_mult = _rap_inner(R, b, slot_lower, slot_upper, slot_lower_BPs, slot_upper_BPs, slot_sq_lower, slot_sq_upper, HELP_sum_lower, HELP_sum_upper, HELP_sum_sq_lower, partition_full, heap_keys, heap_idx, valid_lower, valid_upper, HELP_warm_mult)
+        
+        #Compare to currently best obj_value
+        if Obj_value < current_best_obj:
+            current_best_obj = Obj_value
+            current_best_mult = Opt_mult
+            current_best_partition[:] = partition_full
+            current_best_partition[-1] = Opt_end
+    
+    return current_best_obj, current_best_mult, current_best_partition
 
-    #Calculate breakpoints
-    lower_breakpoints = [lower_bounds[i] + b[i] for i in range(0,num_var)]
-    upper_breakpoints = [upper_bounds[i] + b[i] for i in range(0,num_var)]
 
-    Final_solution = [min(upper_bounds[i],max(lower_bounds[i],current_best_mult - b[i])) for i in range(0,num_var)]
+@njit(cache=True, parallel=True)
+def _rap_partitions(R, b, num_partitions, num_chunks, lower_fixed, upper_fixed, lower_var, upper_var):
+    '''
+    Breakpoint search procedure over all num_partitions partition trunks. The trunks are split into num_chunks
+    contiguous chunks that are processed in parallel by _rap_chunk.
+    Returns the best objective value, the corresponding multiplier and the corresponding partition.
+    '''
+    
+    num_intervals = len(lower_fixed) + 1
+    
+    #Bookkeeping for best solution per chunk
+    chunk_best_obj = np.full(num_chunks, math.inf)
+    chunk_best_mult = np.full(num_chunks, -math.inf)
+    chunk_best_partition = np.full((num_chunks, num_intervals - 1), -1, dtype=np.int64)
+    
+    for chunk in prange(num_chunks):
+        HELP_first = chunk * num_partitions // num_chunks
+        HELP_last = (chunk + 1) * num_partitions // num_chunks
+        Obj_value, Opt_mult, Opt_partition = _rap_chunk(R, b, HELP_first, HELP_last, lower_fixed, upper_fixed, lower_var, upper_var)
+        chunk_best_obj[chunk] = Obj_value
+        chunk_best_mult[chunk] = Opt_mult
+        chunk_best_partition[chunk, :] = Opt_partition
+    
+    #Reduce over chunks (first chunk wins ties, as in a sequential pass)
+    HELP_best = np.argmin(chunk_best_obj)
+    return chunk_best_obj[HELP_best], chunk_best_mult[HELP_best], chunk_best_partition[HELP_best]
+
+
+def _partition_bounds(partition_full, lower_fixed, upper_fixed, lower_var, upper_var):
+    '''
+    Lower and upper bounds of the variables, given the partition: variables up to partition_full[0] lie in interval 1,
+    variables in (partition_full[j-1], partition_full[j]] in interval j+1 and the remaining variables in interval m.
+    '''
+    
+    num_intervals = len(lower_fixed) + 1
+    edges = np.asarray(partition_full, dtype=np.int64) + 1
+    
+    #Variable i lies in interval seg[i]+1
+    seg = np.searchsorted(edges, np.arange(len(lower_var)), side='right')
+    lower_bounds = np.where(seg == 0, lower_var, lower_fixed[np.maximum(seg - 1, 0)])
+    upper_bounds = np.where(seg == num_intervals - 1, upper_var, upper_fixed[np.minimum(seg, num_intervals - 2)])
+    
+    return lower_bounds, upper_bounds
+
+
+def _source_hash():
+    #Hash of this file, embedded in rap_core by build_rap_core.py
+    with open(os.path.abspath(__file__), 'rb') as f:
+        return int(hashlib.sha256(f.read()).hexdigest()[:15], 16)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_rap_core():
+    '''
+    Ahead-of-time compiled sequential search rap_chunk from the extension module rap_core (built by build_rap_core.py)
+    in the directory of this file. Returns None if the module has not been built, or if it was built from a different
+    version of this file (with a warning), in which case the jitted search is used.
+    '''
+    
+    HELP_dir = os.path.dirname(os.path.abspath(__file__))
+    for suffix in importlib.machinery.EXTENSION_SUFFIXES:
+        HELP_path = os.path.join(HELP_dir, 'rap_core' + suffix)
+        if os.path.exists(HELP_path):
+            break
+    else:
+        return None
+    
+    spec = importlib.util.spec_from_file_location('rap_core', HELP_path)
+    rap_core = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(rap_core)
+    if rap_core.source_hash() != _source_hash():
+        warnings.warn('rap_core was built from a different version of Alg_disjoint.py and is not used; rerun build_rap_core.py')
+        return None
+    return rap_core.rap_chunk
+
+
+def RAP_disjoint(R,b,lower_fixed, upper_fixed, lower_var, upper_var):
+    
+    #Convert input to contiguous float64 arrays (once, so that the jitted search gets a single signature)
+    b = np.ascontiguousarray(b, dtype=np.float64)
+    lower_fixed = np.ascontiguousarray(lower_fixed, dtype=np.float64)
+    upper_fixed = np.ascontiguousarray(upper_fixed, dtype=np.float64)
+    lower_var = np.ascontiguousarray(lower_var, dtype=np.float64)
+    upper_var = np.ascontiguousarray(upper_var, dtype=np.float64)
+    
+    #Dimensions
+    num_var = len(b)
+    num_intervals = len(lower_fixed) + 1  
+    
+    #Number of partition trunks (enumerated inside the jitted search)
+    num_partitions = math.comb(num_var + num_intervals - 2, num_intervals - 2)
+    
+    #Breakpoint search procedure over all trunks (jitted), with one chunk of trunks per thread; a single chunk (e.g. the
+    #single trunk for m = 2) or a small amount of work is searched without starting the threads
+    num_chunks = min(get_num_threads(), num_partitions)
+    if num_chunks == 1 or num_partitions * num_var <= _SEQUENTIAL_WORK:
+        rap_chunk_aot = _load_rap_core()
+        if rap_chunk_aot is not None:
+            Obj_value, Opt_mult, Opt_partition = rap_chunk_aot(R, b, 0, num_partitions, lower_fixed, upper_fixed, lower_var, upper_var)
+        else:
+            Obj_value, Opt_mult, Opt_partition = _rap_chunk(R, b, 0, num_partitions, lower_fixed, upper_fixed, lower_var, upper_var)
+    else:
+        Obj_value, Opt_mult, Opt_partition = _rap_partitions(R, b, num_partitions, num_chunks, lower_fixed, upper_fixed, lower_var, upper_var)
+    if Obj_value == math.inf:
+        raise ValueError('The instance has no feasible solution')
+    
+    #Calculate final answer using optimal multiplier and partition (the segment up to the last entry of the partition belongs to interval m-1)
+    lower_bounds, upper_bounds = _partition_bounds(Opt_partition, lower_fixed, upper_fixed, lower_var, upper_var)
+
+    Final_solution = np.clip(Opt_mult - b, lower_bounds, upper_bounds).tolist()
     return Final_solution
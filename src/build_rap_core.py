@@ -0,0 +1,46 @@
+'''
+Ahead-of-time compilation of the sequential breakpoint search of Alg_disjoint into the extension module rap_core,
+so that RAP_disjoint does not have to compile it with Numba on the first call. Run:
+
+    python build_rap_core.py
+
+The module is written next to Alg_disjoint.py together with a hash of that file; Alg_disjoint uses it only if the hash
+still matches and falls back to the jitted search otherwise. Note that numba.pycc is deprecated and emits a
+NumbaPendingDeprecationWarning.
+
+'''
+
+
+
+import os
+import sys
+
+from numba.pycc import CC
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from Alg_disjoint import _rap_chunk, _source_hash
+
+
+
+SOURCE_HASH = _source_hash()
+
+cc = CC('rap_core')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+cc.verbose = False
+
+
+#Hash of the Alg_disjoint.py the module is built from
+@cc.export('source_hash', 'i8()')
+def source_hash():
+    return SOURCE_HASH
+
+
+#Breakpoint search procedure over the partition trunks first, ..., last - 1 (see _rap_chunk in Alg_disjoint)
+@cc.export('rap_chunk', 'Tuple((f8, f8, i8[:]))(f8, f8[:], i8, i8, f8[:], f8[:], f8[:], f8[:])')
+def rap_chunk(R, b, first, last, lower_fixed, upper_fixed, lower_var, upper_var):
+    return _rap_chunk(R, b, first, last, lower_fixed, upper_fixed, lower_var, upper_var)
+
+
+
+if __name__ == '__main__':
+    cc.compile()
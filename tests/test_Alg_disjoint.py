@@ -0,0 +1,129 @@
+'''
+Regression check of Alg_disjoint against brute-force enumeration of the interval of every variable on small instances
+(with integer data, so that many breakpoints coincide), of the parallel search over the partition trunks against the
+sequential one and of the enumeration of the trunks against itertools.
+
+'''
+
+
+
+import itertools
+import math
+import os
+import random
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from Alg_disjoint import RAP_disjoint, _next_partition, _rap_chunk, _rap_partitions, _unrank_partition
+
+
+
+def _box_rap(R, b, lower, upper):
+    #Solve min sum (x_i + b_i)^2 s.t. sum x_i = R, lower <= x <= upper by bisection on the multiplier (None if infeasible)
+    if sum(lower) > R + 1e-9 or sum(upper) < R - 1e-9:
+        return None
+    mult_low = min(lower[i] + b[i] for i in range(0,len(b)))
+    mult_high = max(upper[i] + b[i] for i in range(0,len(b)))
+    for _ in range(0,200):
+        mult = (mult_low + mult_high) / 2
+        if sum(min(upper[i], max(lower[i], mult - b[i])) for i in range(0,len(b))) < R:
+            mult_low = mult
+        else:
+            mult_high = mult
+    return sum((min(upper[i], max(lower[i], mult - b[i])) + b[i])**2 for i in range(0,len(b)))
+
+
+def _brute_force(R, b, lower_fixed, upper_fixed, lower_var, upper_var):
+    num_intervals = len(lower_fixed) + 1
+    best_obj = None
+    for assignment in itertools.product(range(0,num_intervals), repeat=len(b)):
+        lower = [lower_var[i] if j == 0 else lower_fixed[j-1] for i, j in enumerate(assignment)]
+        upper = [upper_var[i] if j == num_intervals - 1 else upper_fixed[j] for i, j in enumerate(assignment)]
+        obj = _box_rap(R, b, lower, upper)
+        if obj is not None and (best_obj is None or obj < best_obj):
+            best_obj = obj
+    return best_obj
+
+
+def _instance(seed):
+    #Random instance with integer data that satisfies the ordering assumptions on b and the variable bounds
+    rng = random.Random(seed)
+    num_var = rng.randint(1,5)
+    num_intervals = rng.randint(2,4)
+    b = sorted((rng.randint(0,4) for _ in range(0,num_var)), reverse=True)
+    lower_fixed = [0]*(num_intervals - 1)
+    upper_fixed = [0]*(num_intervals - 1)
+    upper_fixed[0] = 2
+    lower_fixed[0] = upper_fixed[0] + rng.randint(1,2)
+    for j in range(1,num_intervals - 1):
+        upper_fixed[j] = lower_fixed[j - 1] + rng.randint(1,2)
+        lower_fixed[j] = upper_fixed[j] + rng.randint(1,2)
+    lower_var = sorted(rng.randint(-2,0) for _ in range(0,num_var))
+    upper_var = sorted((rng.randint(lower_fixed[-1] + 1, lower_fixed[-1] + 3) for _ in range(0,num_var)), reverse=True)
+    R = rng.randint(sum(lower_var), sum(upper_var))
+    return R, b, lower_fixed, upper_fixed, lower_var, upper_var
+
+
+def _check(R, b, lower_fixed, upper_fixed, lower_var, upper_var):
+    num_intervals = len(lower_fixed) + 1
+    best_obj = _brute_force(R, b, lower_fixed, upper_fixed, lower_var, upper_var)
+    if best_obj is None:
+        return
+    x = RAP_disjoint(R, b, lower_fixed, upper_fixed, lower_var, upper_var)
+    
+    assert abs(sum(x) - R) <= 1e-6
+    for i in range(0,len(b)):
+        intervals = [(lower_var[i] if j == 0 else lower_fixed[j-1], upper_var[i] if j == num_intervals - 1 else upper_fixed[j]) for j in range(0,num_intervals)]
+        assert any(lower - 1e-9 <= x[i] <= upper + 1e-9 for lower, upper in intervals)
+    assert sum((x[i] + b[i])**2 for i in range(0,len(b))) <= best_obj + 1e-6
+
+
+def test_tied_breakpoints():
+    _check(46, [4,3,2,0,0], [3,5,9], [2,4,7], [-1,-1,0,0,0], [12,12,12,10,10])
+
+
+def test_random_instances():
+    for seed in range(0,300):
+        _check(*_instance(seed))
+
+
+def test_infeasible_instance():
+    #R exceeds the sum of the upper bounds
+    try:
+        RAP_disjoint(40, [2,1,0], [3,5], [2,4], [-1,-1,0], [8,7,7])
+    except ValueError:
+        return
+    raise AssertionError('no ValueError for an infeasible instance')
+
+
+def test_parallel_chunks():
+    #The chunks of the parallel search start at trunks k > 0 and are reduced by argmin; compare with a single sequential pass
+    for seed in range(0,300):
+        R, b, lower_fixed, upper_fixed, lower_var, upper_var = _instance(seed)
+        R = float(R)
+        b, lower_fixed, upper_fixed, lower_var, upper_var = [np.ascontiguousarray(x, dtype=np.float64) for x in (b, lower_fixed, upper_fixed, lower_var, upper_var)]
+        num_partitions = math.comb(len(b) + len(lower_fixed) - 1, len(lower_fixed) - 1)
+        if num_partitions < 3:
+            continue
+        obj_seq, _, _ = _rap_chunk(R, b, 0, num_partitions, lower_fixed, upper_fixed, lower_var, upper_var)
+        obj_par, _, _ = _rap_partitions(R, b, num_partitions, 3, lower_fixed, upper_fixed, lower_var, upper_var)
+        assert obj_par == obj_seq or abs(obj_par - obj_seq) <= 1e-9 * max(1.0, abs(obj_seq))
+
+
+def test_partition_enumeration():
+    #Trunks in the order of itertools.combinations_with_replacement(range(-1,num_var), m-2), followed by a copy of the last entry
+    for num_var in range(1,7):
+        for num_intervals in range(2,6):
+            trunks = list(itertools.combinations_with_replacement(range(-1,num_var), num_intervals - 2))
+            partition_next = np.empty(num_intervals - 1, dtype=np.int64)
+            for k, trunk in enumerate(trunks):
+                expected = list(trunk) + [trunk[-1] if num_intervals > 2 else -1]
+                partition_full = np.empty(num_intervals - 1, dtype=np.int64)
+                _unrank_partition(k, num_var, partition_full)
+                assert partition_full.tolist() == expected
+                if k > 0:
+                    _next_partition(partition_next, num_var)
+                    assert partition_next.tolist() == expected
+                partition_next[:] = partition_full